@@ -1,10 +1,33 @@
 import requests
 import streamlit as st
 import pandas as pd
+import numpy as np
 import base64
 import os
 import io
 import sqlite3
+import queue
+import threading
+import time
+import uuid
+
+# pyarrow is optional, the string dtype falls back to the Python storage without it
+try:
+    import pyarrow  # noqa: F401
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Seconds to wait for an autosave worker to finish a write when it is stopped
+# or when a manual save goes through it
+AUTOSAVE_WAIT_TIMEOUT = 30
+# Longest wait in seconds before retrying a failed autosave
+AUTOSAVE_MAX_RETRY_DELAY = 300
+
+# Rows profiled when inferring a schema, and the largest share of distinct
+# values a text column may have to be stored as a categorical
+TYPED_SAMPLE_ROWS = 1000
+CATEGORY_MAX_RATIO = 0.5
 
 # Initialize session state variables
 if 'token_checked' not in st.session_state:
@@ -23,6 +46,10 @@ if 'db_data' not in st.session_state:
     st.session_state.db_data = None
 if 'file_sha' not in st.session_state:
     st.session_state.file_sha = None
+if 'autosave_workers' not in st.session_state:
+    st.session_state.autosave_workers = {}
+if 'db_schemas' not in st.session_state:
+    st.session_state.db_schemas = {}
     
 # Get secrets with proper error handling
 def get_secret(secret_name, default_value=""):
@@ -109,6 +136,163 @@ def check_repository(repo_owner, repo_name):
     else:
         st.session_state.repo_error = response.text
 
+# Typed loading: sample the data once, turn repetitive text into categoricals
+# and downcast numbers, then keep the schema so reloads and writes reuse it.
+def infer_schema(df, use_string_dtype=False):
+    schema = {}
+    sample = df.head(TYPED_SAMPLE_ROWS)
+    for column in df.columns:
+        series = df[column]
+        if pd.api.types.is_bool_dtype(series):
+            schema[column] = str(series.dtype)
+        elif pd.api.types.is_integer_dtype(series):
+            schema[column] = str(pd.to_numeric(series, downcast='integer').dtype)
+        elif pd.api.types.is_float_dtype(series):
+            values = series.dropna()
+            if len(values) and (values == values.round()).all():
+                # Whole numbers that only became floats because of blanks
+                fitting = [dtype for dtype in widened_dtypes('Int8') if cast_column(series, dtype) is not None]
+                schema[column] = fitting[0] if fitting else 'float64'
+            else:
+                schema[column] = 'float32' if cast_column(series, 'float32') is not None else 'float64'
+        elif pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series) or isinstance(series.dtype, pd.CategoricalDtype):
+            values = sample[column].dropna()
+            if len(values) and values.nunique() / len(values) <= CATEGORY_MAX_RATIO:
+                schema[column] = 'category'
+            elif use_string_dtype:
+                schema[column] = 'string[pyarrow]' if PYARROW_AVAILABLE else 'string'
+            else:
+                schema[column] = 'object'
+        else:
+            schema[column] = str(series.dtype)
+    return schema
+
+# Cast a column to a schema dtype, returns None if the cast would lose data
+def cast_column(series, dtype):
+    try:
+        if dtype == 'category' or dtype.startswith('string') or dtype == 'object':
+            return series.astype(dtype)
+        if dtype.startswith('Int'):
+            # Nullable integers keep blanks but still need whole numbers in range
+            numeric = pd.to_numeric(series)
+            values = numeric.dropna()
+            info = np.iinfo(dtype.lower())
+            if not (values == values.round()).all():
+                return None
+            if len(values) and (values.min() < info.min or values.max() > info.max):
+                return None
+            return numeric.astype(dtype)
+        try:
+            target = np.dtype(dtype)
+        except TypeError:
+            return series.astype(dtype)
+        if target.kind == 'b':
+            # astype(bool) would turn blank cells into False
+            if series.isna().any():
+                return None
+            return series.astype(target)
+        if target.kind not in 'iuf':
+            return series.astype(target)
+        numeric = pd.to_numeric(series)
+        if target.kind in 'iu':
+            if numeric.isna().any() or not (numeric == numeric.round()).all():
+                return None
+            info = np.iinfo(target)
+            if len(numeric) and (numeric.min() < info.min or numeric.max() > info.max):
+                return None
+        cast = numeric.astype(target)
+        if not ((cast == numeric) | numeric.isna()).all():
+            return None
+        return cast
+    except (ValueError, TypeError, OverflowError):
+        return None
+
+# Dtypes to try for a schema entry, widening numbers step by step and falling
+# back to nullable types so a blank cell never turns a column into floats or
+# a missing flag into False
+def widened_dtypes(dtype):
+    int_sizes = ['8', '16', '32', '64']
+    if dtype in ('int' + size for size in int_sizes):
+        sizes = int_sizes[int_sizes.index(dtype[3:]):]
+        return ['int' + size for size in sizes] + ['Int' + size for size in sizes]
+    if dtype in ('Int' + size for size in int_sizes):
+        sizes = int_sizes[int_sizes.index(dtype[3:]):]
+        return ['Int' + size for size in sizes]
+    if dtype == 'float32':
+        return ['float32', 'float64']
+    if dtype == 'bool':
+        return ['bool', 'boolean']
+    return [dtype]
+
+# Cast a DataFrame to a schema, returns the cast frame and the schema actually
+# applied. Callers only store the applied schema when (re)loading a file.
+def apply_schema(df, schema):
+    df = df.copy()
+    applied = {}
+    for column in df.columns:
+        applied[column] = str(df[column].dtype)
+        if column not in schema:
+            continue
+        for dtype in widened_dtypes(schema[column]):
+            cast = cast_column(df[column], dtype)
+            if cast is not None:
+                df[column] = cast
+                applied[column] = dtype
+                break
+    return df, applied
+
+# Categoricals go to the editor as plain text, since Streamlit would limit them
+# to a dropdown of the existing categories, and float32 goes as float64 so a
+# typed decimal isn't rounded before apply_schema can see that it doesn't fit
+def editable_frame(df):
+    editable = {}
+    for column in df.columns:
+        if isinstance(df[column].dtype, pd.CategoricalDtype):
+            editable[column] = object
+        elif df[column].dtype == np.float32:
+            editable[column] = np.float64
+    if not editable:
+        return df
+    return df.astype(editable)
+
+# Numeric widths come from the stored schema, text columns are re-inferred so a
+# categorical that has become high-cardinality goes back to plain text
+def refresh_schema(schema, df, use_string_dtype):
+    inferred = infer_schema(df, use_string_dtype)
+    return {column: inferred[column] if dtype in ('category', 'object') or dtype.startswith('string') else dtype
+            for column, dtype in schema.items()}
+
+# Only text dtypes are passed to the reader, numeric ones are applied afterwards
+# so that a value outside the stored range never gets silently truncated
+def text_dtypes(schema):
+    return {column: dtype for column, dtype in schema.items()
+            if dtype == 'category' or dtype.startswith('string')}
+
+# Read a table with the typed-loading options from session state
+def load_table(conn, table_name):
+    query = f"SELECT * FROM {table_name}"
+    if not st.session_state.get('typed_loading', False):
+        return pd.read_sql_query(query, conn)
+    
+    options = {'use_string_dtype': st.session_state.get('use_string_dtype', False)}
+    stored = st.session_state.db_schemas.get(table_name)
+    if stored and stored['options'] == options:
+        schema = stored['dtypes']
+        # Reuse the stored schema while the options and the columns are unchanged
+        columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table_name})")]
+        if set(columns) == set(schema):
+            df = pd.read_sql_query(query, conn, dtype=text_dtypes(schema))
+            schema = refresh_schema(schema, df, options['use_string_dtype'])
+            df, schema = apply_schema(df, schema)
+            st.session_state.db_schemas[table_name] = {'options': options, 'dtypes': schema}
+            return df
+    
+    df = pd.read_sql_query(query, conn)
+    schema = infer_schema(df, options['use_string_dtype'])
+    df, schema = apply_schema(df, schema)
+    st.session_state.db_schemas[table_name] = {'options': options, 'dtypes': schema}
+    return df
+
 # Check file function and load SQLite
 def check_file(repo_owner, repo_name, file_path):
     # For local testing, use the local database file
@@ -119,7 +303,7 @@ def check_file(repo_owner, repo_name, file_path):
         tables = cursor.fetchall()
         if tables:
             table_name = tables[0][0]
-            df = pd.read_sql_query(f"SELECT * FROM {table_name}", conn)
+            df = load_table(conn, table_name)
             st.session_state.db_data = df
             st.session_state.table_name = table_name
             st.session_state.file_checked = True
@@ -130,16 +314,159 @@ def check_file(repo_owner, repo_name, file_path):
         st.session_state.file_checked = True
         st.session_state.file_valid = False
 
-# Function to save edited SQLite back to GitHub
-def save_sqlite_to_github(repo_owner, repo_name, file_path, df):
+# Replace a table with the DataFrame in a single transaction. pandas commits
+# on its own while writing, so the rows go to a staging table first and only
+# the swap into place runs inside the explicit transaction. Each call gets its
+# own staging table so concurrent writers never share one.
+def write_sqlite_table(df, table_name):
+    staging_name = f"{table_name}__staging_{uuid.uuid4().hex}"
+    conn = None
     try:
         # Save to local SQLite database
-        conn = sqlite3.connect('test.db')
-        df.to_sql(st.session_state.table_name, conn, if_exists='replace', index=False)
-        conn.close()
+        conn = sqlite3.connect('test.db', isolation_level=None)
+        df.to_sql(staging_name, conn, if_exists='replace', index=False)
+        conn.execute("BEGIN")
+        try:
+            conn.execute(f'DROP TABLE IF EXISTS "{table_name}"')
+            conn.execute(f'ALTER TABLE "{staging_name}" RENAME TO "{table_name}"')
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
         return True, "File updated successfully!"
     except Exception as e:
+        if conn is not None:
+            # Cleanup is best effort, the original error is the one to report
+            try:
+                conn.execute(f'DROP TABLE IF EXISTS "{staging_name}"')
+            except Exception:
+                pass
         return False, f"Error: {str(e)}"
+    finally:
+        if conn is not None:
+            conn.close()
+
+# Function to save edited SQLite back to GitHub
+def save_sqlite_to_github(repo_owner, repo_name, file_path, df):
+    return write_sqlite_table(df, st.session_state.table_name)
+
+# Background autosave: edits are queued per table and every snapshot that arrives
+# within the quiet window is coalesced into a single transaction of the latest one.
+# The worker runs outside the script thread and opens its own SQLite connection.
+# Manual saves go through the worker too while it is running.
+class SqliteAutosaveWorker:
+    def __init__(self, table_name, quiet_window):
+        self.table_name = table_name
+        self.quiet_window = quiet_window
+        self.lock = threading.Lock()
+        self.save_lock = threading.Lock()
+        self.queue = queue.Queue()
+        self.last_submitted = None
+        self.pending_edits = 0
+        self.commit_count = 0
+        self.last_error = None
+        self.last_saved_at = None
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    # Queue a snapshot if it differs from the last one queued
+    def submit(self, df):
+        if self.last_submitted is not None and df.equals(self.last_submitted):
+            return
+        self.last_submitted = df.copy()
+        with self.lock:
+            self.pending_edits += 1
+        self.queue.put((self.last_submitted, None))
+
+    # Save a snapshot right away from the script thread. It goes through the
+    # queue, so snapshots still waiting there are replaced by it instead of
+    # being written again as an autosave afterwards.
+    def save_now(self, df):
+        reply = queue.Queue(maxsize=1)
+        self.last_submitted = df.copy()
+        with self.lock:
+            self.pending_edits += 1
+        self.queue.put((self.last_submitted, reply))
+        try:
+            return reply.get(timeout=AUTOSAVE_WAIT_TIMEOUT)
+        except queue.Empty:
+            return False, "Error: autosave is still busy, the save stays queued."
+
+    # Flush whatever is pending and let the thread exit
+    def stop(self):
+        self.queue.put(None)
+
+    # Write a snapshot. The save lock is held across the write so a background
+    # and a manual save never replace the table at the same time.
+    def save(self, df):
+        with self.save_lock:
+            return write_sqlite_table(df, self.table_name)
+
+    def _run(self):
+        df = None
+        edits = 0
+        retry_delay = 0
+        while True:
+            reply = None
+            if df is None:
+                item = self.queue.get()
+                if item is None:
+                    return
+                df, reply = item
+                edits = 1
+            stopping = False
+            # Keep replacing the snapshot until the window passes without an edit,
+            # waiting longer while a failed write is being retried. A manual save
+            # is written straight away.
+            while reply is None:
+                try:
+                    item = self.queue.get(timeout=max(self.quiet_window, retry_delay))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                df, reply = item
+                edits += 1
+            success, message = self.save(df)
+            with self.lock:
+                self.last_error = None if success else message
+                if success:
+                    self.pending_edits -= edits
+                    if reply is None:
+                        self.commit_count += 1
+                    self.last_saved_at = time.strftime("%H:%M:%S")
+            if reply is not None:
+                reply.put((success, message))
+            if success:
+                df = None
+                retry_delay = 0
+            else:
+                # Keep the snapshot and retry it with exponential backoff
+                retry_delay = min(max(retry_delay * 2, self.quiet_window), AUTOSAVE_MAX_RETRY_DELAY)
+            if stopping:
+                return
+
+# Get (or start) the autosave worker for a table
+def get_autosave_worker(file_path, table_name, quiet_window):
+    key = f"{file_path}/{table_name}"
+    workers = st.session_state.autosave_workers
+    if key not in workers or not workers[key].thread.is_alive():
+        workers[key] = SqliteAutosaveWorker(table_name, quiet_window)
+        # The loaded data is already in the database, only queue changes against it
+        workers[key].last_submitted = st.session_state.db_data
+    workers[key].quiet_window = quiet_window
+    return workers[key]
+
+# Stop every autosave worker, flushing their pending edits
+def stop_autosave_workers():
+    for worker in st.session_state.get('autosave_workers', {}).values():
+        worker.stop()
+        worker.thread.join(timeout=AUTOSAVE_WAIT_TIMEOUT)
+        with worker.lock:
+            if worker.pending_edits:
+                st.warning(f"Autosave stopped with {worker.pending_edits} unsaved edits. {worker.last_error or ''}")
+    st.session_state.autosave_workers = {}
 
 # Function to download SQLite from GitHub
 def download_sqlite_from_github(repo_owner, repo_name, file_path):
@@ -152,8 +479,11 @@ def download_sqlite_from_github(repo_owner, repo_name, file_path):
 
 # Reset function
 def reset_all():
+    stop_autosave_workers()
     for key in list(st.session_state.keys()):
-        del st.session_state[key]
+        # Keep inferred schemas so the next load reuses them
+        if key != 'db_schemas':
+            del st.session_state[key]
     st.rerun()  # Updated from st.experimental_rerun()
 
 # Display secrets status
@@ -222,6 +552,19 @@ if github_token:
                     st.session_state.file_path = file_path
             
             if file_path and not st.session_state.file_checked:
+                # Typed loading options
+                typed_loading = st.checkbox(
+                    "Typed loading (categoricals and downcast numbers)",
+                    value=st.session_state.get('typed_loading', False),
+                    help="Repetitive text columns are kept as categoricals in memory and edited as plain text."
+                )
+                st.session_state.typed_loading = typed_loading
+                if typed_loading:
+                    st.session_state.use_string_dtype = st.checkbox(
+                        "Use string dtype for other text columns",
+                        value=st.session_state.get('use_string_dtype', False)
+                    )
+                
                 if st.button("Load SQLite File"):
                     with st.spinner("Loading SQLite file..."):
                         check_file(repo_owner, repo_name, file_path)
@@ -237,24 +580,70 @@ if github_token:
                         # Show original data
                         with st.expander("View Original Data", expanded=False):
                             st.dataframe(st.session_state.db_data)
+                            memory_kib = st.session_state.db_data.memory_usage(deep=True).sum() / 1024
+                            st.caption(f"In-memory size: {memory_kib:.1f} KiB")
+                        
+                        # Autosave settings
+                        autosave = st.checkbox(
+                            "Enable autosave",
+                            value=st.session_state.get('autosave_enabled', False),
+                            help="Edits are written in the background once no further edits arrive within the quiet window."
+                        )
+                        st.session_state.autosave_enabled = autosave
+                        quiet_window = st.number_input(
+                            "Autosave quiet window (seconds):",
+                            min_value=1.0,
+                            value=float(get_secret('AUTOSAVE_WINDOW', 5)),
+                            step=1.0,
+                            disabled=not autosave
+                        )
+                        
+                        worker = None
+                        if autosave:
+                            worker = get_autosave_worker(file_path, st.session_state.table_name, quiet_window)
+                        else:
+                            stop_autosave_workers()
                         
                         # Edit data
                         st.write("Make your changes below:")
                         edited_df = st.data_editor(
-                            st.session_state.db_data,
+                            editable_frame(st.session_state.db_data),
                             num_rows="dynamic",
                             use_container_width=True,
                             hide_index=True
                         )
                         
+                        # Write with the same dtypes the table was loaded with
+                        stored = st.session_state.db_schemas.get(st.session_state.table_name)
+                        schema = stored['dtypes'] if stored else None
+                        if st.session_state.get('typed_loading', False) and schema:
+                            edited_df, _ = apply_schema(edited_df, schema)
+                        
+                        if worker is not None:
+                            worker.submit(edited_df)
+                            with worker.lock:
+                                pending = worker.pending_edits
+                                status = f"Autosave: {worker.commit_count} transactions"
+                                if worker.last_saved_at:
+                                    status += f", last saved at {worker.last_saved_at}"
+                                if pending:
+                                    status += f", {pending} edits pending"
+                                last_error = worker.last_error
+                            st.caption(status)
+                            if last_error:
+                                st.error(f"Autosave failed: {last_error}")
+                        
                         # Save changes
                         col1, col2 = st.columns(2)
                         with col1:
                             if st.button("Save Changes to GitHub"):
                                 with st.spinner("Saving changes..."):
-                                    success, message = save_sqlite_to_github(
-                                        repo_owner, repo_name, file_path, edited_df
-                                    )
+                                    if worker is not None:
+                                        success, message = worker.save_now(edited_df)
+                                    else:
+                                        success, message = save_sqlite_to_github(
+                                            repo_owner, repo_name, file_path, edited_df
+                                        )
                                     if success:
                                         st.session_state.db_data = edited_df  # Update the local data
                                         st.success(message)
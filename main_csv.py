@@ -1,12 +1,31 @@
 import requests
 import streamlit as st
 import pandas as pd
+import numpy as np
 import base64
 import os
 import io
+import queue
+import threading
+import time
 
+# pyarrow is optional, typed loading falls back to the default engine without it
+try:
+    import pyarrow  # noqa: F401
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
 
+# Seconds to wait for an autosave worker to finish a write when it is stopped
+# or when a manual save goes through it
+AUTOSAVE_WAIT_TIMEOUT = 30
+# Longest wait in seconds before retrying a failed autosave
+AUTOSAVE_MAX_RETRY_DELAY = 300
 
+# Rows profiled when inferring a schema, and the largest share of distinct
+# values a text column may have to be stored as a categorical
+TYPED_SAMPLE_ROWS = 1000
+CATEGORY_MAX_RATIO = 0.5
 
 # Initialize session state variables
 if 'token_checked' not in st.session_state:
@@ -25,6 +44,10 @@ if 'csv_data' not in st.session_state:
     st.session_state.csv_data = None
 if 'file_sha' not in st.session_state:
     st.session_state.file_sha = None
+if 'autosave_workers' not in st.session_state:
+    st.session_state.autosave_workers = {}
+if 'csv_schemas' not in st.session_state:
+    st.session_state.csv_schemas = {}
     
 # Get secrets with proper error handling
 def get_secret(secret_name, default_value=""):
@@ -98,6 +121,167 @@ def check_repository(repo_owner, repo_name):
     else:
         st.session_state.repo_error = response.text
 
+# Typed loading: sample the data once, turn repetitive text into categoricals
+# and downcast numbers, then keep the schema so reloads and writes reuse it.
+def infer_schema(df, use_string_dtype=False):
+    schema = {}
+    sample = df.head(TYPED_SAMPLE_ROWS)
+    for column in df.columns:
+        series = df[column]
+        if pd.api.types.is_bool_dtype(series):
+            schema[column] = str(series.dtype)
+        elif pd.api.types.is_integer_dtype(series):
+            schema[column] = str(pd.to_numeric(series, downcast='integer').dtype)
+        elif pd.api.types.is_float_dtype(series):
+            values = series.dropna()
+            if len(values) and (values == values.round()).all():
+                # Whole numbers that only became floats because of blanks
+                fitting = [dtype for dtype in widened_dtypes('Int8') if cast_column(series, dtype) is not None]
+                schema[column] = fitting[0] if fitting else 'float64'
+            else:
+                schema[column] = 'float32' if cast_column(series, 'float32') is not None else 'float64'
+        elif pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series) or isinstance(series.dtype, pd.CategoricalDtype):
+            values = sample[column].dropna()
+            if len(values) and values.nunique() / len(values) <= CATEGORY_MAX_RATIO:
+                schema[column] = 'category'
+            elif use_string_dtype:
+                schema[column] = 'string[pyarrow]' if PYARROW_AVAILABLE else 'string'
+            else:
+                schema[column] = 'object'
+        else:
+            schema[column] = str(series.dtype)
+    return schema
+
+# Cast a column to a schema dtype, returns None if the cast would lose data
+def cast_column(series, dtype):
+    try:
+        if dtype == 'category' or dtype.startswith('string') or dtype == 'object':
+            return series.astype(dtype)
+        if dtype.startswith('Int'):
+            # Nullable integers keep blanks but still need whole numbers in range
+            numeric = pd.to_numeric(series)
+            values = numeric.dropna()
+            info = np.iinfo(dtype.lower())
+            if not (values == values.round()).all():
+                return None
+            if len(values) and (values.min() < info.min or values.max() > info.max):
+                return None
+            return numeric.astype(dtype)
+        try:
+            target = np.dtype(dtype)
+        except TypeError:
+            return series.astype(dtype)
+        if target.kind == 'b':
+            # astype(bool) would turn blank cells into False
+            if series.isna().any():
+                return None
+            return series.astype(target)
+        if target.kind not in 'iuf':
+            return series.astype(target)
+        numeric = pd.to_numeric(series)
+        if target.kind in 'iu':
+            if numeric.isna().any() or not (numeric == numeric.round()).all():
+                return None
+            info = np.iinfo(target)
+            if len(numeric) and (numeric.min() < info.min or numeric.max() > info.max):
+                return None
+        cast = numeric.astype(target)
+        if not ((cast == numeric) | numeric.isna()).all():
+            return None
+        return cast
+    except (ValueError, TypeError, OverflowError):
+        return None
+
+# Dtypes to try for a schema entry, widening numbers step by step and falling
+# back to nullable types so a blank cell never turns a column into floats or
+# a missing flag into False
+def widened_dtypes(dtype):
+    int_sizes = ['8', '16', '32', '64']
+    if dtype in ('int' + size for size in int_sizes):
+        sizes = int_sizes[int_sizes.index(dtype[3:]):]
+        return ['int' + size for size in sizes] + ['Int' + size for size in sizes]
+    if dtype in ('Int' + size for size in int_sizes):
+        sizes = int_sizes[int_sizes.index(dtype[3:]):]
+        return ['Int' + size for size in sizes]
+    if dtype == 'float32':
+        return ['float32', 'float64']
+    if dtype == 'bool':
+        return ['bool', 'boolean']
+    return [dtype]
+
+# Cast a DataFrame to a schema, returns the cast frame and the schema actually
+# applied. Callers only store the applied schema when (re)loading a file.
+def apply_schema(df, schema):
+    df = df.copy()
+    applied = {}
+    for column in df.columns:
+        applied[column] = str(df[column].dtype)
+        if column not in schema:
+            continue
+        for dtype in widened_dtypes(schema[column]):
+            cast = cast_column(df[column], dtype)
+            if cast is not None:
+                df[column] = cast
+                applied[column] = dtype
+                break
+    return df, applied
+
+# Categoricals go to the editor as plain text, since Streamlit would limit them
+# to a dropdown of the existing categories, and float32 goes as float64 so a
+# typed decimal isn't rounded before apply_schema can see that it doesn't fit
+def editable_frame(df):
+    editable = {}
+    for column in df.columns:
+        if isinstance(df[column].dtype, pd.CategoricalDtype):
+            editable[column] = object
+        elif df[column].dtype == np.float32:
+            editable[column] = np.float64
+    if not editable:
+        return df
+    return df.astype(editable)
+
+# Numeric widths come from the stored schema, text columns are re-inferred so a
+# categorical that has become high-cardinality goes back to plain text
+def refresh_schema(schema, df, use_string_dtype):
+    inferred = infer_schema(df, use_string_dtype)
+    return {column: inferred[column] if dtype in ('category', 'object') or dtype.startswith('string') else dtype
+            for column, dtype in schema.items()}
+
+# Only text dtypes are passed to the reader, numeric ones are applied afterwards
+# so that a value outside the stored range never gets silently truncated
+def text_dtypes(schema):
+    return {column: dtype for column, dtype in schema.items()
+            if dtype == 'category' or dtype.startswith('string')}
+
+# Schemas are keyed like the autosave workers, since the same path can exist in several repos
+def schema_key(repo_owner, repo_name, file_path):
+    return f"{repo_owner}/{repo_name}/{file_path}"
+
+# Parse CSV content with the typed-loading options from session state
+def load_csv(content, key):
+    if not st.session_state.get('typed_loading', False):
+        return pd.read_csv(io.StringIO(content))
+    
+    engine = 'pyarrow' if st.session_state.get('use_pyarrow', False) and PYARROW_AVAILABLE else 'c'
+    options = {'use_string_dtype': st.session_state.get('use_string_dtype', False)}
+    stored = st.session_state.csv_schemas.get(key)
+    if stored and stored['options'] == options:
+        schema = stored['dtypes']
+        # Reuse the stored schema while the options and the columns are unchanged
+        columns = pd.read_csv(io.StringIO(content), nrows=0).columns
+        if set(columns) == set(schema):
+            df = pd.read_csv(io.StringIO(content), engine=engine, dtype=text_dtypes(schema))
+            schema = refresh_schema(schema, df, options['use_string_dtype'])
+            df, schema = apply_schema(df, schema)
+            st.session_state.csv_schemas[key] = {'options': options, 'dtypes': schema}
+            return df
+    
+    df = pd.read_csv(io.StringIO(content), engine=engine)
+    schema = infer_schema(df, options['use_string_dtype'])
+    df, schema = apply_schema(df, schema)
+    st.session_state.csv_schemas[key] = {'options': options, 'dtypes': schema}
+    return df
+
 # Check file function and load CSV
 def check_file(repo_owner, repo_name, file_path):
     file_url = f"https://api.github.com/repos/{repo_owner}/{repo_name}/contents/{file_path}"
@@ -115,18 +299,15 @@ def check_file(repo_owner, repo_name, file_path):
         if file_path.endswith('.csv'):
             try:
                 content = base64.b64decode(file_data['content']).decode('utf-8')
-                df = pd.read_csv(io.StringIO(content))
+                df = load_csv(content, schema_key(repo_owner, repo_name, file_path))
                 st.session_state.csv_data = df
             except Exception as e:
                 st.session_state.file_error = f"Error parsing CSV: {str(e)}"
     else:
         st.session_state.file_error = response.text
 
-# Function to save edited CSV back to GitHub
-def save_csv_to_github(repo_owner, repo_name, file_path, df):
-    if not st.session_state.file_sha:
-        return False, "File SHA is missing. Cannot update file."
-    
+# Commit a DataFrame as the new file content, returns (success, message, new_sha)
+def put_csv_content(repo_owner, repo_name, file_path, df, sha, headers, message):
     file_url = f"https://api.github.com/repos/{repo_owner}/{repo_name}/contents/{file_path}"
     
     try:
@@ -140,23 +321,173 @@ def save_csv_to_github(repo_owner, repo_name, file_path, df):
         
         # Prepare update data
         update_data = {
-            "message": "Update CSV via Streamlit app",
+            "message": message,
             "content": encoded_content,
-            "sha": st.session_state.file_sha
+            "sha": sha
         }
         
         # Update the file
-        response = requests.put(file_url, headers=get_headers(), json=update_data)
+        response = requests.put(file_url, headers=headers, json=update_data)
         
         if response.status_code == 200 or response.status_code == 201:
-            # Update the SHA for future updates
-            st.session_state.file_sha = response.json()['content']['sha']
-            return True, "File updated successfully!"
+            return True, "File updated successfully!", response.json()['content']['sha']
         else:
-            return False, f"Error: {response.status_code} - {response.text}"
+            return False, f"Error: {response.status_code} - {response.text}", sha
             
     except Exception as e:
-        return False, f"Error: {str(e)}"
+        return False, f"Error: {str(e)}", sha
+
+# Function to save edited CSV back to GitHub
+def save_csv_to_github(repo_owner, repo_name, file_path, df):
+    if not st.session_state.file_sha:
+        return False, "File SHA is missing. Cannot update file."
+    
+    success, message, new_sha = put_csv_content(
+        repo_owner, repo_name, file_path, df,
+        st.session_state.file_sha, get_headers(), "Update CSV via Streamlit app"
+    )
+    if success:
+        # Update the SHA for future updates
+        st.session_state.file_sha = new_sha
+    return success, message
+
+# Background autosave: edits are queued per file and every snapshot that arrives
+# within the quiet window is coalesced into a single commit of the latest one.
+# The worker runs outside the script thread, so it keeps its own copy of the
+# headers and file SHA instead of touching st.session_state. Manual saves go
+# through the worker too while it is running, so both share one SHA.
+class CsvAutosaveWorker:
+    def __init__(self, repo_owner, repo_name, file_path, sha, headers, quiet_window):
+        self.repo_owner = repo_owner
+        self.repo_name = repo_name
+        self.file_path = file_path
+        self.file_sha = sha
+        self.headers = headers
+        self.quiet_window = quiet_window
+        self.lock = threading.Lock()
+        self.save_lock = threading.Lock()
+        self.queue = queue.Queue()
+        self.last_submitted = None
+        self.pending_edits = 0
+        self.commit_count = 0
+        self.last_error = None
+        self.last_saved_at = None
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    # Queue a snapshot if it differs from the last one queued
+    def submit(self, df):
+        if self.last_submitted is not None and df.equals(self.last_submitted):
+            return
+        self.last_submitted = df.copy()
+        with self.lock:
+            self.pending_edits += 1
+        self.queue.put((self.last_submitted, None))
+
+    # Save a snapshot right away from the script thread. It goes through the
+    # queue, so snapshots still waiting there are replaced by it instead of
+    # being written again as an autosave afterwards.
+    def save_now(self, df):
+        reply = queue.Queue(maxsize=1)
+        self.last_submitted = df.copy()
+        with self.lock:
+            self.pending_edits += 1
+        self.queue.put((self.last_submitted, reply))
+        try:
+            return reply.get(timeout=AUTOSAVE_WAIT_TIMEOUT)
+        except queue.Empty:
+            return False, "Error: autosave is still busy, the save stays queued."
+
+    # Flush whatever is pending and let the thread exit
+    def stop(self):
+        self.queue.put(None)
+
+    # Commit a snapshot against the current SHA. The save lock is held across
+    # the PUT so a background and a manual save never send the same SHA.
+    def save(self, df, message):
+        with self.save_lock:
+            with self.lock:
+                sha = self.file_sha
+            success, result, new_sha = put_csv_content(
+                self.repo_owner, self.repo_name, self.file_path, df, sha, self.headers, message
+            )
+            if success:
+                with self.lock:
+                    self.file_sha = new_sha
+            return success, result
+
+    def _run(self):
+        df = None
+        edits = 0
+        retry_delay = 0
+        while True:
+            reply = None
+            if df is None:
+                item = self.queue.get()
+                if item is None:
+                    return
+                df, reply = item
+                edits = 1
+            stopping = False
+            # Keep replacing the snapshot until the window passes without an edit,
+            # waiting longer while a failed write is being retried. A manual save
+            # is written straight away.
+            while reply is None:
+                try:
+                    item = self.queue.get(timeout=max(self.quiet_window, retry_delay))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                df, reply = item
+                edits += 1
+            success, message = self.save(df, "Update CSV via Streamlit app" if reply is not None
+                                         else f"Autosave CSV via Streamlit app ({edits} edits)")
+            with self.lock:
+                self.last_error = None if success else message
+                if success:
+                    self.pending_edits -= edits
+                    if reply is None:
+                        self.commit_count += 1
+                    self.last_saved_at = time.strftime("%H:%M:%S")
+            if reply is not None:
+                reply.put((success, message))
+            if success:
+                df = None
+                retry_delay = 0
+            else:
+                # Keep the snapshot and retry it with exponential backoff
+                retry_delay = min(max(retry_delay * 2, self.quiet_window), AUTOSAVE_MAX_RETRY_DELAY)
+            if stopping:
+                return
+
+# Get (or start) the autosave worker for a file
+def get_autosave_worker(repo_owner, repo_name, file_path, quiet_window):
+    key = f"{repo_owner}/{repo_name}/{file_path}"
+    workers = st.session_state.autosave_workers
+    if key not in workers or not workers[key].thread.is_alive():
+        workers[key] = CsvAutosaveWorker(
+            repo_owner, repo_name, file_path,
+            st.session_state.file_sha, get_headers(), quiet_window
+        )
+        # The loaded data is already on GitHub, only queue changes against it
+        workers[key].last_submitted = st.session_state.csv_data
+    workers[key].quiet_window = quiet_window
+    return workers[key]
+
+# Stop every autosave worker, flushing their pending edits, and carry the SHA
+# of their last commit over so manual saves don't send a stale one
+def stop_autosave_workers():
+    for worker in st.session_state.get('autosave_workers', {}).values():
+        worker.stop()
+        worker.thread.join(timeout=AUTOSAVE_WAIT_TIMEOUT)
+        with worker.lock:
+            if worker.pending_edits:
+                st.warning(f"Autosave stopped with {worker.pending_edits} unsaved edits. {worker.last_error or ''}")
+            if worker.file_sha:
+                st.session_state.file_sha = worker.file_sha
+    st.session_state.autosave_workers = {}
 
 # Function to download CSV from GitHub
 def download_csv_from_github(repo_owner, repo_name, file_path):
@@ -172,8 +503,11 @@ def download_csv_from_github(repo_owner, repo_name, file_path):
 
 # Reset function
 def reset_all():
+    stop_autosave_workers()
     for key in list(st.session_state.keys()):
-        del st.session_state[key]
+        # Keep inferred schemas so the next load reuses them
+        if key != 'csv_schemas':
+            del st.session_state[key]
     st.rerun()  # Updated from st.experimental_rerun()
 
 # Display secrets status
@@ -242,6 +576,25 @@ if github_token:
                     st.session_state.file_path = file_path
             
             if file_path and not st.session_state.file_checked:
+                # Typed loading options
+                typed_loading = st.checkbox(
+                    "Typed loading (categoricals and downcast numbers)",
+                    value=st.session_state.get('typed_loading', False),
+                    help="Repetitive text columns are kept as categoricals in memory and edited as plain text."
+                )
+                st.session_state.typed_loading = typed_loading
+                if typed_loading:
+                    st.session_state.use_pyarrow = st.checkbox(
+                        "Use pyarrow engine",
+                        value=st.session_state.get('use_pyarrow', False) and PYARROW_AVAILABLE,
+                        disabled=not PYARROW_AVAILABLE,
+                        help=None if PYARROW_AVAILABLE else "pyarrow is not installed."
+                    )
+                    st.session_state.use_string_dtype = st.checkbox(
+                        "Use string dtype for other text columns",
+                        value=st.session_state.get('use_string_dtype', False)
+                    )
+                
                 if st.button("Load CSV File"):
                     with st.spinner("Loading CSV file..."):
                         check_file(repo_owner, repo_name, file_path)
@@ -257,24 +610,76 @@ if github_token:
                         # Show original data
                         with st.expander("View Original Data", expanded=False):
                             st.dataframe(st.session_state.csv_data)
+                            memory_kib = st.session_state.csv_data.memory_usage(deep=True).sum() / 1024
+                            st.caption(f"In-memory size: {memory_kib:.1f} KiB")
+                        
+                        # Autosave settings
+                        autosave = st.checkbox(
+                            "Enable autosave",
+                            value=st.session_state.get('autosave_enabled', False),
+                            help="Edits are committed in the background once no further edits arrive within the quiet window."
+                        )
+                        st.session_state.autosave_enabled = autosave
+                        quiet_window = st.number_input(
+                            "Autosave quiet window (seconds):",
+                            min_value=1.0,
+                            value=float(get_secret('AUTOSAVE_WINDOW', 5)),
+                            step=1.0,
+                            disabled=not autosave
+                        )
+                        
+                        worker = None
+                        if autosave:
+                            worker = get_autosave_worker(repo_owner, repo_name, file_path, quiet_window)
+                            # Pick up the SHA of the latest background commit
+                            with worker.lock:
+                                if worker.file_sha:
+                                    st.session_state.file_sha = worker.file_sha
+                        else:
+                            stop_autosave_workers()
                         
                         # Edit data
                         st.write("Make your changes below:")
                         edited_df = st.data_editor(
-                            st.session_state.csv_data,
+                            editable_frame(st.session_state.csv_data),
                             num_rows="dynamic",
                             use_container_width=True,
                             hide_index=True
                         )
                         
+                        # Write with the same dtypes the file was loaded with
+                        stored = st.session_state.csv_schemas.get(schema_key(repo_owner, repo_name, file_path))
+                        schema = stored['dtypes'] if stored else None
+                        if st.session_state.get('typed_loading', False) and schema:
+                            edited_df, _ = apply_schema(edited_df, schema)
+                        
+                        if worker is not None:
+                            worker.submit(edited_df)
+                            with worker.lock:
+                                pending = worker.pending_edits
+                                status = f"Autosave: {worker.commit_count} commits"
+                                if worker.last_saved_at:
+                                    status += f", last saved at {worker.last_saved_at}"
+                                if pending:
+                                    status += f", {pending} edits pending"
+                                last_error = worker.last_error
+                            st.caption(status)
+                            if last_error:
+                                st.error(f"Autosave failed: {last_error}")
+                        
                         # Save changes
                         col1, col2 = st.columns(2)
                         with col1:
                             if st.button("Save Changes to GitHub"):
                                 with st.spinner("Saving changes..."):
-                                    success, message = save_csv_to_github(
-                                        repo_owner, repo_name, file_path, edited_df
-                                    )
+                                    if worker is not None:
+                                        success, message = worker.save_now(edited_df)
+                                        with worker.lock:
+                                            st.session_state.file_sha = worker.file_sha
+                                    else:
+                                        success, message = save_csv_to_github(
+                                            repo_owner, repo_name, file_path, edited_df
+                                        )
                                     if success:
                                         st.session_state.csv_data = edited_df  # Update the local data
                                         st.success(message)